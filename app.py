@@ -13,14 +13,13 @@ from typing import Any
 
 import colorlog
 import epdb
-import yaml
 from binance.client import Client
 
 # allow migration from old pickle format to new format
 # old pickle cointains app.Bot, app.Coin
 from lib.bot import Bot  # pylint: disable=unused-import
 from lib.coin import Coin  # pylint: disable=unused-import
-from lib.helpers import cached_binance_client
+from lib.helpers import cached_binance_client, yaml_safe_load
 
 
 def control_center() -> None:
@@ -45,9 +44,9 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     with open(args.config, encoding="utf-8") as _f:
-        cfg = yaml.safe_load(_f.read())
+        cfg = yaml_safe_load(_f.read())
     with open(args.secrets, encoding="utf-8") as _f:
-        secrets = yaml.safe_load(_f.read())
+        secrets = yaml_safe_load(_f.read())
     cfg["MODE"] = args.mode
 
     PID = getpid()
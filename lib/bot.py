@@ -4,19 +4,32 @@ import hashlib
 import json
 import logging
 import pprint
+import re
 from datetime import datetime
 from functools import lru_cache
-from os import fsync, unlink
+from os import (
+    O_APPEND,
+    O_CREAT,
+    O_WRONLY,
+    close,
+    fsync,
+    replace,
+    unlink,
+    write,
+)
+from os import open as os_open
 from os.path import basename, exists
 from time import sleep
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Set, Tuple
 
 import requests
 import udatetime
+import ujson
 import yaml
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from pyrate_limiter import Duration, Limiter, RequestRate
+from requests.adapters import HTTPAdapter
 from tenacity import retry, wait_exponential
 
 from lib.coin import Coin
@@ -27,11 +40,18 @@ from lib.helpers import (
     floor_value,
     mean,
     percent,
+    yaml_safe_load,
 )
 
 rate = RequestRate(600, Duration.MINUTE)  # 600 requests per minute
 limiter = Limiter(rate)
 
+# price.log lines look like '<date> <time.us> <symbol> <price>'; capture the
+# 19 byte second-resolution timestamp, the symbol, and the price in one pass
+# over the raw bytes. compiled once, as split_logline() is called for every
+# line of every logfile during backtesting.
+PRICE_LOG_LINE_RE: re.Pattern = re.compile(rb"^(.{19})\S* (\S+) (\S+)\s*$")
+
 
 class Bot:
     """Bot Class"""
@@ -136,6 +156,11 @@ class Bot:
         # coins, those remain in our wallet.
         # Mostly used for quitting a backtesting session early
         self.stop_bot_on_stale: bool = config.get("STOP_BOT_ON_STALE", False)
+        # how many iterations of the run() loop between state saves to
+        # disk; the bot always saves its state when told to quit.
+        self.save_state_every: int = int(config.get("SAVE_STATE_EVERY", 10))
+        # run() iterations since the state was last saved to disk
+        self.iterations_since_save: int = 0
         # indicates where we found a control/STOP flag file
         self.stop_flag: bool = False
         # set by the bot so to quit safely as soon as possible.
@@ -158,8 +183,38 @@ class Bot:
         self.klines_caching_service_url: str = config.get(
             "KLINES_CACHING_SERVICE_URL", "http://klines:8999"
         )
+        # pooled, keep-alive session for the klines caching service, so
+        # that we don't pay for a fresh TCP handshake on every fetch
+        self.klines_session: requests.Session = requests.Session()
+        self.klines_session.mount(
+            "http://", HTTPAdapter(pool_connections=32, pool_maxsize=64)
+        )
+        self.klines_session.mount(
+            "https://", HTTPAdapter(pool_connections=32, pool_maxsize=64)
+        )
         # price.log service
         self.price_log_service: str = config["PRICE_LOG_SERVICE_URL"]
+        # coins loaded from a state file that haven't had the current
+        # config settings applied to them yet. instead of walking every
+        # cached coin at boot, we apply the config the first time the bot
+        # touches a coin.
+        self.pending_config_overrides: Set[str] = set()
+        # memoized past_soft_limit() percentages; the decay curve only
+        # depends on the symbol config and the age of the coin in whole
+        # seconds, so we can cache it across ticks and re-buys.
+        self.ttl_cache: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        # cached O_APPEND descriptor used by write_log(), so that we don't
+        # rebuild the whole python file-object stack on every price line.
+        self.price_log_fd: int = -1
+        self.price_log_fd_path: str = ""
+        # the set of tickers the bot can actually trade; computed once
+        # instead of re-testing pairing suffix and BULL/BEAR substrings
+        # for every price log line.
+        self.valid_tickers: Set[str] = set()
+        self.compute_valid_tickers()
+        # the earliest timestamp at which process_line will consume
+        # another price line for each symbol; see PAUSE_FOR.
+        self.next_read_date: Dict[str, float] = {}
 
     def extract_order_data(
         self, order_details: dict[str, Any], coin: Coin
@@ -199,6 +254,25 @@ class Bot:
             )
         return (False, {})
 
+    def compute_valid_tickers(self) -> None:
+        """precomputes the set of tickers process_line can act on"""
+
+        # the bot only trades coins in our PAIRING and never any of the
+        # leveraged BULL/BEAR style tokens. resolve all of that here once,
+        # so that the backtesting hot path pays for a single set lookup
+        # per line instead of ~10 substring searches.
+        pairing = self.pairing
+        flavours = ("UP", "DOWN", "BULL", "BEAR")
+        bad_substrings = tuple(f"{w}{pairing}" for w in flavours) + tuple(
+            f"{pairing}{w}" for w in flavours
+        )
+        self.valid_tickers = {
+            symbol
+            for symbol in self.tickers
+            if symbol.endswith(pairing)
+            and not any(b in symbol for b in bad_substrings)
+        }
+
     def run_strategy(self, coin: Coin) -> bool:
         """runs a specific strategy against a coin"""
 
@@ -210,6 +284,12 @@ class Bot:
         if coin.symbol not in self.tickers:
             return False
 
+        # config overrides from load_coins() are applied lazily, on the
+        # first time we look at a coin.
+        if self.pending_config_overrides:
+            if coin.symbol in self.pending_config_overrides:
+                self.override_coin_config(coin.symbol)
+
         # skip any coins that were involved in a recent STOP_LOSS.
         if self.coins[coin.symbol].naughty:
             return False
@@ -500,7 +580,7 @@ class Bot:
         volume: float = float(_volume)
 
         # we never place binance orders in backtesting mode.
-        if self.mode in ["testnet", "live"]:
+        if self.mode in ("testnet", "live"):
             if not self.place_buy_order(coin, volume):
                 return False
 
@@ -511,7 +591,7 @@ class Bot:
 
         # in backtesting we tipically assume the price paid is the price listed
         # in our price.log file.
-        if self.mode in ["backtesting"]:
+        if self.mode == "backtesting":
             coin.bought_at = float(coin.price)
             coin.volume = float(volume)
             coin.value = float(coin.bought_at) * float(coin.volume)
@@ -560,7 +640,7 @@ class Bot:
 
         coins_before_sale = len(self.wallet)
         # in backtesting mode, we never place sell orders on binance
-        if self.mode in ["testnet", "live"]:
+        if self.mode in ("testnet", "live"):
             if not self.place_sell_order(coin):
                 return False
 
@@ -671,7 +751,7 @@ class Bot:
 
                     if self.mode == "backtesting" and not exists(f_path):
                         with open(f_path, "w") as f:
-                            f.write(json.dumps(info))
+                            f.write(ujson.dumps(info))
 
                     with open("log/binance.step_size.log", "at") as f:
                         f.write(f"{symbol} {step_size}\n")
@@ -730,8 +810,20 @@ class Bot:
             price_log = (
                 f"{self.logs_dir}/{datetime.now().strftime('%Y%m%d')}.log"
             )
-        with open(price_log, "a", encoding="utf-8") as f:
-            f.write(f"{datetime.now()} {symbol} {price}\n")
+
+        # keep an O_APPEND descriptor open between calls, open() would
+        # build a TextIOWrapper + BufferedWriter for every price line.
+        # on a new day we simply swap the descriptor for the new logfile.
+        if price_log != self.price_log_fd_path:
+            if self.price_log_fd != -1:
+                close(self.price_log_fd)
+            self.price_log_fd = os_open(
+                price_log, O_WRONLY | O_APPEND | O_CREAT, 0o644
+            )
+            self.price_log_fd_path = price_log
+        write(
+            self.price_log_fd, f"{datetime.now()} {symbol} {price}\n".encode()
+        )
 
     def init_or_update_coin(
         self, binance_data: Dict[str, Any], load_klines=True
@@ -805,43 +897,52 @@ class Bot:
 
     def process_coins(self) -> None:
         """processes all the prices returned by binance"""
-        # look for coins that are ready for buying, or selling
+        # look for coins that are ready for buying, or selling.
+        # this loop runs for every binance symbol on every tick, hoist the
+        # mode checks out of the loop and avoid the repeated self.coins[]
+        # lookups in its body.
+        tickers = self.tickers
+        coins = self.coins
+        wallet = self.wallet
+        write_price_log = self.mode in ("logmode", "testnet")
+        trading_mode = self.mode in ("live", "backtesting", "testnet")
         for binance_data in self.get_binance_prices():
             coin_symbol = binance_data["symbol"]
             price = binance_data["price"]
 
             # we write the price.logs in TESTNET mode as we want to be able
             # to debug for issues while developing the bot.
-            if self.mode in ["logmode", "testnet"]:
+            if write_price_log:
                 self.write_log(coin_symbol, price)
 
-            if self.mode not in ["live", "backtesting", "testnet"]:
+            if not trading_mode:
                 continue
 
             # TODO: revisit this, as this function is only called in
             # live, testnet and logmode. And the within this function, we
             # expect to process all the coins.
             # don't process any coins which we don't have in our config
-            if coin_symbol not in self.tickers:
+            if coin_symbol not in tickers:
                 continue
 
             # TODO: revisit this as the function below expects to process all
             # the coins
             self.init_or_update_coin(binance_data)
+            coin = coins[coin_symbol]
 
             # if a coin has been blocked due to a stop_loss, we want to make
             # sure we reset the coin stats for the duration of the ban and
             # not just when the stop-loss event happened.
             # TODO: we are reseting the stats on every iteration while this
             # coin is in naughty state, look on how to avoid doing this.
-            if self.coins[coin_symbol].naughty:
-                self.clear_coin_stats(self.coins[coin_symbol])
+            if coin.naughty:
+                self.clear_coin_stats(coin)
 
             # and run the strategy
-            _ = self.run_strategy(self.coins[coin_symbol])
+            _ = self.run_strategy(coin)
 
-            if coin_symbol in self.wallet:
-                self.log_debug_coin(self.coins[coin_symbol])
+            if coin_symbol in wallet:
+                self.log_debug_coin(coin)
 
     def target_sell(self, coin: Coin) -> bool:
         """
@@ -852,7 +953,10 @@ class Bot:
             return True
 
         if coin.status == "HOLD":
-            if coin.price > percent(coin.sell_at_percentage, coin.bought_at):
+            # the compare below runs on every tick for every coin we hold,
+            # inline the percentage arithmetic rather than paying for a
+            # percent() call.
+            if coin.price > coin.bought_at / 100 * coin.sell_at_percentage:
                 coin.status = "TARGET_SELL"
                 s_value: float = (
                     percent(
@@ -879,7 +983,9 @@ class Bot:
         """checks for possible loss on a coin"""
         # oh we already own this one, lets check prices
         # deal with STOP_LOSS
-        if coin.price < percent(coin.stop_loss_at_percentage, coin.bought_at):
+        # inlined percent() arithmetic, this check runs on every tick for
+        # every coin we hold
+        if coin.price < coin.bought_at / 100 * coin.stop_loss_at_percentage:
             if coin.status != "STOP_LOSS":
                 logging.info(
                     f"{c_from_timestamp(coin.date)}: {coin.symbol} "
@@ -889,7 +995,7 @@ class Bot:
             if not self.sell_coin(coin):
                 return False
 
-            self.losses = self.losses + 1
+            self.losses += 1
             # places the coin in the naughty corner by setting the naughty_date
             # NAUGHTY_TIMEOUT will kick in from now on
             coin.naughty_date = (
@@ -912,10 +1018,12 @@ class Bot:
         # when we have reached the TARGET_SELL and a coin drops in price
         # below the SELL_AT_PERCENTAGE price we sell the coin immediately
         # if SELL_AS_SOON_IT_DROPS is set
-        if coin.status in [
-            "TARGET_SELL",
-            "GONE_UP_AND_DROPPED",
-        ] and coin.price < percent(coin.sell_at_percentage, coin.bought_at):
+        # inlined percent() arithmetic, this check runs on every tick for
+        # every coin we hold
+        if (
+            coin.status in ("TARGET_SELL", "GONE_UP_AND_DROPPED")
+            and coin.price < coin.bought_at / 100 * coin.sell_at_percentage
+        ):
             coin.status = "GONE_UP_AND_DROPPED"
             logging.info(
                 f"{c_from_timestamp(coin.date)}: {coin.symbol} "
@@ -923,7 +1031,7 @@ class Bot:
             )
             if not self.sell_coin(coin):
                 return False
-            self.wins = self.wins + 1
+            self.wins += 1
             return True
         return False
 
@@ -948,13 +1056,15 @@ class Bot:
         if coin.price < coin.last:
             # and has it gone the below the 'tip' more than our
             # TRAIL_TARGET_SELL_PERCENTAGE ?
-            if coin.price < percent(
-                coin.trail_target_sell_percentage, coin.tip
+            # inlined percent() arithmetic, as this runs on every tick
+            if (
+                coin.price
+                < coin.tip / 100 * coin.trail_target_sell_percentage
             ):
                 # let's sell it then
                 if not self.sell_coin(coin):
                     return False
-                self.wins = self.wins + 1
+                self.wins += 1
                 return True
         return False
 
@@ -973,7 +1083,7 @@ class Bot:
             coin.status = "STALE"
             if not self.sell_coin(coin):
                 return False
-            self.stales = self.stales + 1
+            self.stales += 1
 
             # any coins that enter a STOP_LOSS or a STALE get added to the
             # naughty list, so that we prevent the bot from buying this coin
@@ -1016,6 +1126,21 @@ class Bot:
         # HARD_LIMIT_HOLDING_TIME as a percentage and use it that value as
         # a percentage of the total SELL_AT_PERCENTAGE value.
         if coin.holding_time > coin.soft_limit_holding_time:
+            # the percentages only depend on the symbol and its age in
+            # whole seconds, so check the memoized curve first
+            key = (coin.symbol, int(coin.holding_time))
+            cached = self.ttl_cache.get(key)
+            if cached is not None:
+                (
+                    coin.sell_at_percentage,
+                    coin.trail_target_sell_percentage,
+                ) = cached
+                self.log_debug_coin(coin)
+                return True
+
+            # local-name rebinds, see target_sell()
+            p = percent
+            a100 = add_100
             ttl: float = 100 * (
                 1
                 - (
@@ -1027,25 +1152,23 @@ class Bot:
                 )
             )
 
-            coin.sell_at_percentage = add_100(
-                percent(
-                    ttl, float(self.tickers[coin.symbol]["SELL_AT_PERCENTAGE"])
-                )
+            coin.sell_at_percentage = a100(
+                p(ttl, float(self.tickers[coin.symbol]["SELL_AT_PERCENTAGE"]))
             )
 
             # make sure we never set the SELL_AT_PERCENTAGE below what we've
             # had to pay in fees.
             # However, It's quite likely that if we didn't sell our coin by
             # now, we are likely to hit HARD_LIMIT_HOLDING_TIME
-            if coin.sell_at_percentage < add_100(2 * self.trading_fee):
-                coin.sell_at_percentage = add_100(2 * self.trading_fee)
+            if coin.sell_at_percentage < a100(2 * self.trading_fee):
+                coin.sell_at_percentage = a100(2 * self.trading_fee)
 
             # and also reduce the TRAIL_TARGET_SELL_PERCENTAGE in the same
             # way we reduced our SELL_AT_PERCENTAGE.
             # We're fine with this one going close to 0.
             coin.trail_target_sell_percentage = (
-                add_100(
-                    percent(
+                a100(
+                    p(
                         ttl,
                         float(
                             self.tickers[coin.symbol][
@@ -1057,42 +1180,51 @@ class Bot:
                 - 0.001
             )
 
+            self.ttl_cache[key] = (
+                coin.sell_at_percentage,
+                coin.trail_target_sell_percentage,
+            )
             self.log_debug_coin(coin)
             return True
         return False
 
     def log_debug_coin(self, coin: Coin) -> None:
         """logs debug coin prices"""
-        if self.debug:
-            logging.debug(
-                f"{c_from_timestamp(coin.date)} {coin.symbol} "
-                + f"{coin.status} "
-                + f"age:{coin.holding_time} "
-                + f"now:{coin.price} "
-                + f"bought:{coin.bought_at} "
-                + f"sell:{(coin.sell_at_percentage - 100):.4f}% "
-                + "trail_target_sell:"
-                + f"{(coin.trail_target_sell_percentage - 100):.4f}% "
-                + f"LP:{coin.min:.3f} "
-            )
-            logging.debug(f"{coin.symbol} : price:{coin.price}")
-            logging.debug(f"{coin.symbol} : min:{coin.min}")
-            logging.debug(f"{coin.symbol} : max:{coin.max}")
-            logging.debug(f"{coin.symbol} : lowest['m']:{coin.lowest['m']}")
-            logging.debug(f"{coin.symbol} : lowest['h']:{coin.lowest['h']}")
-            logging.debug(f"{coin.symbol} : lowest['d']:{coin.lowest['d']}")
+        if not self.debug:
+            return
+
+        # this method is called on every tick for coins we track, don't
+        # pay for building ~15 log strings when no handler will accept
+        # DEBUG records; %-style args keep the formatting lazy too.
+        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
+
+        logging.debug(
+            "%s %s %s age:%s now:%s bought:%s "
+            + "sell:%.4f%% trail_target_sell:%.4f%% LP:%.3f ",
+            c_from_timestamp(coin.date),
+            coin.symbol,
+            coin.status,
+            coin.holding_time,
+            coin.price,
+            coin.bought_at,
+            coin.sell_at_percentage - 100,
+            coin.trail_target_sell_percentage - 100,
+            coin.min,
+        )
+        logging.debug("%s : price:%s", coin.symbol, coin.price)
+        logging.debug("%s : min:%s", coin.symbol, coin.min)
+        logging.debug("%s : max:%s", coin.symbol, coin.max)
+        for unit in ["m", "h", "d"]:
             logging.debug(
-                f"{coin.symbol} : averages['m']:{coin.averages['m']}"
+                "%s : lowest[%s]:%s", coin.symbol, unit, coin.lowest[unit]
             )
             logging.debug(
-                f"{coin.symbol} : averages['h']:{coin.averages['h']}"
+                "%s : averages[%s]:%s", coin.symbol, unit, coin.averages[unit]
             )
             logging.debug(
-                f"{coin.symbol} : averages['d']:{coin.averages['d']}"
+                "%s : highest[%s]:%s", coin.symbol, unit, coin.highest[unit]
             )
-            logging.debug(f"{coin.symbol} : highest['m']:{coin.highest['m']}")
-            logging.debug(f"{coin.symbol} : highest['h']:{coin.highest['h']}")
-            logging.debug(f"{coin.symbol} : highest['d']:{coin.highest['d']}")
 
     def clear_all_coins_stats(self) -> None:
         """clear important coin stats such as max, min price on all coins"""
@@ -1178,8 +1310,10 @@ class Bot:
                         b.flush()
                         fsync(b.fileno())
 
-        # convert .pyobject to a .json compatible format
-        with open(state_coins, "wt") as f:
+        # convert .pyobject to a .json compatible format.
+        # write to a temp file and atomically swap it into place, so a
+        # crash mid-write can never leave a truncated state file behind.
+        with open(f"{state_coins}.tmp", "wt") as f:
             objects: dict[str, Dict[str, Any]] = {}
             for symbol in self.coins.keys():  # pylint: disable=C0206,C0201
                 # TODO: move this into a Coin.__to_dict method
@@ -1243,14 +1377,46 @@ class Bot:
 
                 # objects[symbol] = self.coins[symbol].__dict__
 
-            f.write(json.dumps(objects))
+            # ujson serializes these coin blobs several times faster than
+            # the stdlib json, and this runs on every iteration of run()
+            f.write(ujson.dumps(objects))
             f.flush()
             fsync(f.fileno())
+        replace(f"{state_coins}.tmp", state_coins)
 
-        with open(state_wallet, "wt") as f:
-            f.write(json.dumps(self.wallet))
+        with open(f"{state_wallet}.tmp", "wt") as f:
+            f.write(ujson.dumps(self.wallet))
             f.flush()
             fsync(f.fileno())
+        replace(f"{state_wallet}.tmp", state_wallet)
+
+    def override_coin_config(self, symbol: str) -> None:
+        """applies the current tickers config settings onto a coin"""
+
+        # coins loaded from a state file carry the settings from the previous
+        # bot run, apply whatever is in the config file now.
+        self.pending_config_overrides.discard(symbol)
+        coin = self.coins[symbol]
+        ticker = self.tickers[symbol]
+
+        coin.buy_at_percentage = add_100(ticker["BUY_AT_PERCENTAGE"])
+        coin.sell_at_percentage = add_100(ticker["SELL_AT_PERCENTAGE"])
+        coin.stop_loss_at_percentage = add_100(
+            ticker["STOP_LOSS_AT_PERCENTAGE"]
+        )
+        coin.soft_limit_holding_time = int(ticker["SOFT_LIMIT_HOLDING_TIME"])
+        coin.hard_limit_holding_time = int(ticker["HARD_LIMIT_HOLDING_TIME"])
+        coin.trail_target_sell_percentage = add_100(
+            ticker["TRAIL_TARGET_SELL_PERCENTAGE"]
+        )
+        coin.trail_recovery_percentage = add_100(
+            ticker["TRAIL_RECOVERY_PERCENTAGE"]
+        )
+        coin.klines_trend_period = str(ticker["KLINES_TREND_PERIOD"])
+        coin.klines_slice_percentage_change = float(
+            ticker["KLINES_SLICE_PERCENTAGE_CHANGE"]
+        )
+        coin.naughty_timeout = int(ticker["NAUGHTY_TIMEOUT"])
 
     def load_coins(self) -> None:
         """loads coins and wallet from a local state file"""
@@ -1261,7 +1427,7 @@ class Bot:
         # Overriding and deleting any data we might not want to keep.
 
         load_klines = True
-        if self.mode in ["live", "testnet"]:
+        if self.mode in ("live", "testnet"):
             coins_state_file = "state/coins.json"
             wallet_state_file = "state/wallet.json"
         else:
@@ -1275,14 +1441,14 @@ class Bot:
         if exists(wallet_state_file):
             logging.warning("found wallet.json, loading wallet")
             with open(wallet_state_file, "rt") as f:
-                self.wallet = json.loads(f.read())
+                self.wallet = ujson.loads(f.read())
             logging.warning(f"wallet contains {self.wallet}")
 
         # load existing coins stats
         if exists(coins_state_file):
             logging.warning("found coins.json, loading coins")
             with open(coins_state_file, "rt") as f:
-                objects: dict[str, Any] = dict(json.loads(f.read()))
+                objects: dict[str, Any] = dict(ujson.loads(f.read()))
                 for symbol in objects.keys():  # pylint: disable=C0206
                     # discard any coins for which we don't have tickers info
                     # if we don't, init_or_update_coin() would raise and error
@@ -1296,58 +1462,40 @@ class Bot:
                         for k, v in objects[symbol].items():
                             setattr(self.coins[symbol], k, v)
 
+                        # rebuild the process_line pause gate from the
+                        # last_read_date we just restored.
+                        self.next_read_date[symbol] = (
+                            self.coins[symbol].last_read_date + self.pause
+                        )
+
             logging.warning(f"coins contains {str(self.coins.keys())}")
 
         # sync our coins state with the list of coins we want to use.
-        # but keep using coins we currently have on our wallet
-        coins_to_remove: List[str] = []
-        for coin in self.coins:
-            if coin not in self.tickers and coin not in self.wallet:
-                coins_to_remove.append(coin)
-
-        for coin in coins_to_remove:
-            del self.coins[coin]
+        # but keep using coins we currently have on our wallet.
+        # rebuilt in a single pass instead of collect-then-delete.
+        tickers = self.tickers
+        wallet = self.wallet
+        self.coins = {
+            symbol: coin
+            for symbol, coin in self.coins.items()
+            if symbol in tickers or symbol in wallet
+        }
 
-        # finally apply the current settings in the config file
+        # finally apply the current settings in the config file.
+        # we do this lazily, the first time the bot touches a coin, as
+        # walking thousands of cached coins at every boot is expensive.
         symbols: str = " ".join(self.coins.keys())
         logging.warning(f"overriding values from config for: {symbols}")
-        for symbol in self.coins:  # pylint: disable=C0206
-            self.coins[symbol].buy_at_percentage = add_100(
-                self.tickers[symbol]["BUY_AT_PERCENTAGE"]
-            )
-            self.coins[symbol].sell_at_percentage = add_100(
-                self.tickers[symbol]["SELL_AT_PERCENTAGE"]
-            )
-            self.coins[symbol].stop_loss_at_percentage = add_100(
-                self.tickers[symbol]["STOP_LOSS_AT_PERCENTAGE"]
-            )
-            self.coins[symbol].soft_limit_holding_time = int(
-                self.tickers[symbol]["SOFT_LIMIT_HOLDING_TIME"]
-            )
-            self.coins[symbol].hard_limit_holding_time = int(
-                self.tickers[symbol]["HARD_LIMIT_HOLDING_TIME"]
-            )
-            self.coins[symbol].trail_target_sell_percentage = add_100(
-                self.tickers[symbol]["TRAIL_TARGET_SELL_PERCENTAGE"]
-            )
-            self.coins[symbol].trail_recovery_percentage = add_100(
-                self.tickers[symbol]["TRAIL_RECOVERY_PERCENTAGE"]
-            )
-            self.coins[symbol].klines_trend_period = str(
-                self.tickers[symbol]["KLINES_TREND_PERIOD"]
-            )
-            self.coins[symbol].klines_slice_percentage_change = float(
-                self.tickers[symbol]["KLINES_SLICE_PERCENTAGE_CHANGE"]
-            )
-
-            self.coins[symbol].naughty_timeout = int(
-                self.tickers[symbol]["NAUGHTY_TIMEOUT"]
-            )
+        self.pending_config_overrides = set(self.coins)
 
         # log some info on the coins in our wallet at boot
         if self.wallet:
             logging.info("Wallet contains:")
             for symbol in self.wallet:
+                # the log lines below consume config driven values, so
+                # bring the coins we hold up to date right away
+                if symbol in self.pending_config_overrides:
+                    self.override_coin_config(symbol)
                 sell_price = (
                     float(
                         self.coins[symbol].bought_at
@@ -1441,10 +1589,18 @@ class Bot:
             if self.pull_config_address:
                 _ = self.refresh_config_from_config_endpoint_service()
             self.process_coins()
-            # saves all coin and wallet data to disk
-            self.save_coins()
+            # saves all coin and wallet data to disk every few
+            # iterations, rewriting the full state every single pass is
+            # mostly fsync time.
+            self.iterations_since_save += 1
+            if self.iterations_since_save >= self.save_state_every:
+                self.save_coins()
+                self.iterations_since_save = 0
             self.process_control_flags()
             if self.quit:
+                # a final save, so that we never lose the tail of the
+                # session to the batching above.
+                self.save_coins()
                 return
 
             self.wait()
@@ -1457,22 +1613,27 @@ class Bot:
             self.wait()
 
     # TODO: re-work output values to OK, values
-    def split_logline(self, line: str) -> Tuple[Any, Any, Any]:
-        """splits a log line into symbol, date, price"""
+    def split_logline(self, line: bytes) -> Tuple[Any, Any, Any]:
+        """splits a price.log line into symbol, date, price"""
+
+        # match on the raw bytes with a precompiled pattern, we only pay
+        # for decoding the two small fields we actually consume.
+        matched = PRICE_LOG_LINE_RE.match(line)
+        if not matched:
+            return (False, False, False)
 
         try:
-            symbol, price = line[27:].split(" ", maxsplit=1)
             # ocasionally binance returns rubbish
             # we just skip it
-            market_price = float(price)
+            market_price = float(matched.group(3))
         except ValueError:
             return (False, False, False)
 
         # datetime is very slow, discard the .microseconds and fetch a
         # cached pre-calculated unix epoch timestamp
-        date = c_date_from(line[0:19])
+        date = c_date_from(matched.group(1).decode())
 
-        return (symbol, date, market_price)
+        return (matched.group(2).decode(), date, market_price)
 
     def check_for_delisted_coin(self, symbol: str) -> bool:
         """checks if a coin has been delisted"""
@@ -1491,6 +1652,7 @@ class Bot:
                 logging.warning(f"removing {symbol} from tickers")
                 del self.coins[symbol]
                 del self.tickers[symbol]
+                self.valid_tickers.discard(symbol)
                 return True
         return False
 
@@ -1504,36 +1666,35 @@ class Bot:
 
         # TODO: rework this, generate a binance_data blob to pass to
         # init_or_update_coin()
-        if symbol not in self.coins:
-            if symbol not in self.tickers:
-                return
-            if not symbol.endswith(self.cfg["PAIRING"]):
-                return
-
-            # discard any BULL/BEAR tokens
-            if any(
-                f"{w}{self.cfg['PAIRING']}" in symbol
-                for w in ["UP", "DOWN", "BULL", "BEAR"]
-            ) or any(
-                f"{self.cfg['PAIRING']}{w}" in symbol
-                for w in ["UP", "DOWN", "BULL", "BEAR"]
-            ):
+        # one dict probe covers both the membership test and the lookup
+        # the old `symbol not in self.coins` dance paid for twice.
+        coin = self.coins.get(symbol)
+        if coin is None:
+            # covers the tickers list, the pairing suffix, and discards
+            # any BULL/BEAR tokens; see compute_valid_tickers()
+            if symbol not in self.valid_tickers:
                 return
-            self.coins[symbol] = Coin(
+            # Coin() coerces every field itself, so we pass the raw
+            # ticker values through a single dict lookup instead of
+            # re-casting each one here.
+            ticker = self.tickers[symbol]
+            coin = Coin(
                 symbol,
-                float(date),
-                float(market_price),
-                float(self.tickers[symbol]["BUY_AT_PERCENTAGE"]),
-                float(self.tickers[symbol]["SELL_AT_PERCENTAGE"]),
-                float(self.tickers[symbol]["STOP_LOSS_AT_PERCENTAGE"]),
-                float(self.tickers[symbol]["TRAIL_TARGET_SELL_PERCENTAGE"]),
-                float(self.tickers[symbol]["TRAIL_RECOVERY_PERCENTAGE"]),
-                int(self.tickers[symbol]["SOFT_LIMIT_HOLDING_TIME"]),
-                int(self.tickers[symbol]["HARD_LIMIT_HOLDING_TIME"]),
-                int(self.tickers[symbol]["NAUGHTY_TIMEOUT"]),
-                str(self.tickers[symbol]["KLINES_TREND_PERIOD"]),
-                float(self.tickers[symbol]["KLINES_SLICE_PERCENTAGE_CHANGE"]),
+                date,
+                market_price,
+                ticker["BUY_AT_PERCENTAGE"],
+                ticker["SELL_AT_PERCENTAGE"],
+                ticker["STOP_LOSS_AT_PERCENTAGE"],
+                ticker["TRAIL_TARGET_SELL_PERCENTAGE"],
+                ticker["TRAIL_RECOVERY_PERCENTAGE"],
+                ticker["SOFT_LIMIT_HOLDING_TIME"],
+                ticker["HARD_LIMIT_HOLDING_TIME"],
+                ticker["NAUGHTY_TIMEOUT"],
+                ticker["KLINES_TREND_PERIOD"],
+                ticker["KLINES_SLICE_PERCENTAGE_CHANGE"],
             )
+            self.coins[symbol] = coin
+            self.next_read_date[symbol] = date + self.pause
             if self.check_for_delisted_coin(symbol):
                 return
         else:
@@ -1541,20 +1702,27 @@ class Bot:
             # our price logs.
             # we essentially skip a number of iterations between
             # reads, causing a similar effect if we were only
-            # probing prices every PAUSE_FOR seconds
-            # last_read_date contains the timestamp of the last time we read
-            # a price record for this particular coin.
-            if self.coins[symbol].last_read_date + self.pause > date:
+            # probing prices every PAUSE_FOR seconds.
+            # next_read_date is a flat dict gate, which is cheaper to
+            # consult than the last_read_date attribute on the coin for
+            # the lines we end up discarding.
+            if date < self.next_read_date.get(symbol, 0.0):
                 return
-            self.coins[symbol].last_read_date = date
-            self.update(self.coins[symbol], date, market_price)
+            self.next_read_date[symbol] = date + self.pause
+            coin.last_read_date = date
+            self.update(coin, date, market_price)
 
         # and finally run through the strategy for our coin.
-        self.run_strategy(self.coins[symbol])
+        self.run_strategy(coin)
 
     def backtesting(self) -> None:
         """the bot Backtesting main loop"""
-        logging.info(json.dumps(self.cfg, indent=4))
+
+        # skip the json serialization and the per-logfile wallet scans
+        # below entirely when INFO logging is suppressed.
+        info_enabled: bool = logging.getLogger().isEnabledFor(logging.INFO)
+        if info_enabled:
+            logging.info(json.dumps(self.cfg, indent=4))
 
         # first load all our state from disk
         self.load_coins()
@@ -1567,29 +1735,35 @@ class Bot:
 
         else:
             with requests.Session() as session:
+                # filter at the bytes level, so that lines for symbols
+                # outside our pairing are skipped without paying for a
+                # utf-8 decode each.
+                pairing_b: bytes = self.cfg["PAIRING"].encode()
                 for logfile in self.cfg["PRICE_LOGS"]:
                     if self.quit:
                         break
-                    for w, v in [
-                        ("backtesting:", logfile),
-                        ("wallet:", self.wallet),
-                        ("exposure:", self.calculates_exposure()),
-                    ]:
-                        logging.info(f"{w} {v}")
-
-                    response: Tuple[bool, List[bytes]] = self.get_price_log(
-                        session,
-                        f"{self.cfg['PRICE_LOG_SERVICE_URL']}/{logfile}",
+                    if info_enabled:
+                        for w, v in [
+                            ("backtesting:", logfile),
+                            ("wallet:", self.wallet),
+                            ("exposure:", self.calculates_exposure()),
+                        ]:
+                            logging.info("%s %s", w, v)
+
+                    response: Tuple[bool, Iterable[bytes]] = (
+                        self.get_price_log(
+                            session,
+                            f"{self.cfg['PRICE_LOG_SERVICE_URL']}/{logfile}",
+                        )
                     )
                     ok, lines = response
 
                     if ok:
                         for item in lines:
-                            line: str = item.decode()
-                            if self.cfg["PAIRING"] not in line:
+                            if pairing_b not in item:
                                 continue
                             symbol, date, market_price = self.split_logline(
-                                str(line)
+                                item
                             )
                             # symbol will be False if we fail to process the line fields
                             if not symbol:
@@ -1597,26 +1771,30 @@ class Bot:
 
                             self.process_line(symbol, date, market_price)
 
-                    current_exposure = float(0)
-                    for symbol in self.wallet:
-                        current_exposure = (
-                            current_exposure + self.coins[symbol].profit
-                        )
+                # only the final state matters for the results, so build
+                # them once after consuming all the price logs instead of
+                # once per logfile.
+                current_exposure = float(0)
+                for symbol in self.wallet:
+                    current_exposure = (
+                        current_exposure + self.coins[symbol].profit
+                    )
 
-                    backtesting_results = {
-                        "exposure": current_exposure,
-                        "profit": self.profit,
-                        "initial_investment": self.initial_investment,
-                        "days": len(self.price_logs),
-                        "wins": self.wins,
-                        "losses": self.losses,
-                        "stales": self.stales,
-                        "wallet": self.wallet,
-                        "config_filename": basename(self.config_file),
-                        "cfg": self.cfg,
-                    }
+                backtesting_results = {
+                    "exposure": current_exposure,
+                    "profit": self.profit,
+                    "initial_investment": self.initial_investment,
+                    "days": len(self.price_logs),
+                    "wins": self.wins,
+                    "losses": self.losses,
+                    "stales": self.stales,
+                    "wallet": self.wallet,
+                    "config_filename": basename(self.config_file),
+                    "cfg": self.cfg,
+                }
 
         # now that we are done, lets record our results
+        config_basename: str = basename(self.config_file)
         with open(
             f"{self.logs_dir}/backtesting.log", "a", encoding="utf-8"
         ) as f:
@@ -1630,22 +1808,22 @@ class Bot:
                     f"investment:{self.initial_investment}",
                     f"days:{len(self.price_logs)}",
                     f"w{self.wins},l{self.losses},s{self.stales},h{len(self.wallet)}",
-                    f"cfg:{basename(self.config_file)}",
-                    json.dumps(self.cfg),
+                    f"cfg:{config_basename}",
+                    ujson.dumps(self.cfg),
                 ]
             )
 
             f.write(f"{log_entry}\n")
 
         with open(
-            f"tmp/{basename(self.config_file)}.results.json",
+            f"tmp/{config_basename}.results.json",
             "wt",
         ) as f:
-            f.write(json.dumps(backtesting_results))
+            f.write(ujson.dumps(backtesting_results))
 
         self.save_coins(
-            f"tmp/{basename(self.config_file)}.coins.json",
-            f"tmp/{basename(self.config_file)}.wallet.json",
+            f"tmp/{config_basename}.coins.json",
+            f"tmp/{config_basename}.wallet.json",
         )
 
     def load_klines_for_coin(self, coin: Coin) -> bool:
@@ -1655,7 +1833,7 @@ class Bot:
         data: Dict[str, Dict[str, List[List[float]]]] = {}
         # fetch all the available klines for this coin, for the last
         # 60min, 24h, and 1000 days
-        response: requests.Response = requests.get(
+        response: requests.Response = self.klines_session.get(
             self.klines_caching_service_url
             + f"?symbol={coin.symbol}"
             + f"&date={coin.date}"
@@ -1663,7 +1841,9 @@ class Bot:
             + f"&debug={self.debug}",
             timeout=30,
         )
-        data = response.json()
+        # ujson chews through the large nested klines lists a lot faster
+        # than the stdlib json parser behind response.json()
+        data = ujson.loads(response.content)
         if data:
             ok = True
             coin.lowest = data["lowest"]
@@ -1795,6 +1975,11 @@ class Bot:
                 new_tickers[symbol] = self.tickers[symbol]
 
             self.tickers = new_tickers
+            # the memoized past_soft_limit() percentages and the tradeable
+            # tickers set are derived from the tickers config, refresh
+            # them now that it changed
+            self.ttl_cache.clear()
+            self.compute_valid_tickers()
             now: str = udatetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
             logging.info(
                 f"{now}: updating tickers: had: "
@@ -1813,7 +1998,7 @@ class Bot:
             # the bot will have access to all the ticker info on any coins
             # it might be holding
             with open(self.config_file, encoding="utf-8") as f:
-                _cfg: Dict[str, Any] = yaml.safe_load(f.read())
+                _cfg: Dict[str, Any] = yaml_safe_load(f.read())
                 _cfg["TICKERS"] = self.tickers
             with open(self.config_file, "wt", encoding="utf-8") as f:
                 yaml.dump(_cfg, f, default_flow_style=False)
@@ -1854,7 +2039,7 @@ class Bot:
         coin.price = market_price
 
         # update any coin we HOLD with the number seconds since we bought it
-        if coin.status in ["TARGET_SELL", "HOLD"]:
+        if coin.status in ("TARGET_SELL", "HOLD"):
             coin.holding_time = int(coin.date - coin.bought_date)
 
         # if we had a STOP_LOSS event, and we've expired the NAUGHTY_TIMEOUT
@@ -2052,7 +2237,7 @@ class Bot:
 
         # if the strategy doesn't consume averages, we force an average setting
         # in here of 2hours so that we can use an anti-pump protection
-        timeslice: int = int("".join(coin.klines_trend_period[:-1]))
+        timeslice: int = coin.klines_trend_count
         if timeslice == 0:
             coin.klines_trend_period = "2h"
             coin.klines_slice_percentage_change = float(1)
@@ -2094,17 +2279,21 @@ class Bot:
 
     def get_price_log(
         self, session: requests.Session, query: str
-    ) -> Tuple[bool, List[bytes]]:
+    ) -> Tuple[bool, Iterable[bytes]]:
         """retry wrapper for requests calls"""
 
         for w in [1, 2, 3, 4]:
             try:
-                response: requests.Response = session.get(query, timeout=30)
+                response: requests.Response = session.get(
+                    query, timeout=30, stream=True
+                )
                 status: int = response.status_code
                 if status != 200:
                     response.raise_for_status()
                 else:
-                    return (True, (response.content).splitlines())
+                    # stream the logfile instead of materializing the
+                    # whole day of price lines in memory at once.
+                    return (True, response.iter_lines(chunk_size=65536))
 
             except requests.exceptions.RequestException as e:
                 with open("log/price_log_service.response.log", "at") as f:
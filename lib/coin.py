@@ -7,7 +7,46 @@ from lib.helpers import add_100
 class Coin:  # pylint: disable=too-few-public-methods
     """Coin Class"""
 
-    offset: Optional[Dict[str, int]] = {"s": 60, "m": 3600, "h": 86400}
+    # slotted attributes avoid the per-instance __dict__, saving a few
+    # hundred bytes per coin and making the attribute lookups done on
+    # every price tick a straight C-level descriptor read.
+    __slots__ = (
+        "symbol",
+        "volume",
+        "bought_at",
+        "min",
+        "max",
+        "date",
+        "price",
+        "holding_time",
+        "value",
+        "cost",
+        "last",
+        "buy_at_percentage",
+        "sell_at_percentage",
+        "stop_loss_at_percentage",
+        "status",
+        "trail_recovery_percentage",
+        "trail_target_sell_percentage",
+        "dip",
+        "tip",
+        "profit",
+        "soft_limit_holding_time",
+        "hard_limit_holding_time",
+        "naughty_timeout",
+        "lowest",
+        "averages",
+        "highest",
+        "_klines_trend_period",
+        "klines_trend_unit",
+        "klines_trend_count",
+        "klines_slice_percentage_change",
+        "bought_date",
+        "naughty_date",
+        "naughty",
+        "last_read_date",
+        "offset",
+    )
 
     def __init__(
         self,
@@ -93,7 +132,7 @@ class Coin:  # pylint: disable=too-few-public-methods
             "d": [],
         }
         # How long to look for trend changes in a coin price
-        self.klines_trend_period: str = str(klines_trend_period)
+        self.klines_trend_period = str(klines_trend_period)
         # percentage of coin price change in a trend_period slice
         self.klines_slice_percentage_change: float = float(
             klines_slice_percentage_change
@@ -106,3 +145,24 @@ class Coin:  # pylint: disable=too-few-public-methods
         self.naughty: bool = False
         # used in backtesting, the last read date, as the date in the price.log
         self.last_read_date: float = date
+        # number of seconds in each of the price bucket units
+        self.offset: Optional[Dict[str, int]] = {
+            "s": 60,
+            "m": 3600,
+            "h": 86400,
+        }
+
+    @property
+    def klines_trend_period(self) -> str:
+        """klines trend period, in the '7d' config string form"""
+        return self._klines_trend_period
+
+    @klines_trend_period.setter
+    def klines_trend_period(self, period: str) -> None:
+        period = str(period)
+        self._klines_trend_period = period
+        # cache the parsed unit and count; the strategies and the
+        # pump-and-dump check consume these on every tick and shouldn't
+        # re-slice the string each time
+        self.klines_trend_unit: str = str(period[-1:]).lower()
+        self.klines_trend_count: int = int("".join(period[:-1]))
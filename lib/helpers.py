@@ -7,38 +7,63 @@ from datetime import datetime
 from functools import lru_cache
 from os.path import exists, getctime
 from time import sleep, time
+from typing import Any
 
 import udatetime
+import yaml
 from binance.client import Client
 from filelock import SoftFileLock
 from tenacity import retry, wait_exponential
 
+try:
+    # the libyaml-backed loader parses large TICKERS configs much faster
+    # than the pure-python SafeLoader
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as YamlLoader  # type: ignore
+
+
+def yaml_safe_load(contents: str) -> Any:
+    """yaml.safe_load() through the libyaml loader when available"""
+    return yaml.load(contents, Loader=YamlLoader)  # nosec
+
 
 def mean(values: list[float]) -> float:
     """returns the mean value of an array of integers"""
     return sum(values) / len(values)
 
 
-@lru_cache(1024)
 def percent(part: float, whole: float) -> float:
     """returns the percentage value of a number"""
-    result: float = float(whole) / 100 * float(part)
-    return result
+    # this is cheaper than the hash+lookup cost of a lru_cache
+    return float(whole) / 100 * float(part)
 
 
-@lru_cache(1024)
 def add_100(number: float) -> float:
     """adds 100 to a number"""
     return 100 + float(number)
 
 
-@lru_cache(64)
-def c_date_from(day: str) -> float:
-    """returns a cached datetime.fromisoformat()"""
-    return datetime.fromisoformat(day).timestamp()
+# fromisoformat() is expensive and consecutive price.log lines share the
+# same minute, so we keep our own cache keyed on the minute prefix of the
+# timestamp and simply add the seconds back on each call.
+_minute_epoch_cache: dict[str, float] = {}
 
 
-@lru_cache(64)
+def c_date_from(day: str) -> float:
+    """returns a cached unix epoch timestamp for a YYYY-MM-DD HH:MM:SS str"""
+    minute: str = day[:16]
+    base = _minute_epoch_cache.get(minute)
+    if base is None:
+        # one entry per minute, so this covers ~11 days of logs
+        if len(_minute_epoch_cache) >= 16384:
+            _minute_epoch_cache.clear()
+        base = datetime.fromisoformat(minute).timestamp()
+        _minute_epoch_cache[minute] = base
+    return base + float(day[17:19])
+
+
+@lru_cache(4096)
 def c_from_timestamp(date: float) -> datetime:
     """returns a cached datetime.fromtimestamp()"""
     return datetime.fromtimestamp(date)
@@ -1,7 +1,7 @@
 """ bot buy strategy file """
 from lib.bot import Bot
 from lib.coin import Coin
-from lib.helpers import c_from_timestamp, logging, percent
+from lib.helpers import c_from_timestamp, logging
 
 
 class Strategy(Bot):
@@ -23,7 +23,8 @@ class Strategy(Bot):
             # TARGET_DIP
             coin.status == ""
             and not coin.naughty
-            and coin.price < percent(coin.buy_at_percentage, coin.max)
+            # inlined percent() arithmetic, this check runs on every tick
+            and coin.price < coin.max / 100 * coin.buy_at_percentage
         ):
             coin.dip = coin.price
             logging.info(
@@ -39,7 +40,7 @@ class Strategy(Bot):
         # to the TRAIL_RECOVERY_PERCENTAGE, then buy.
         self.log_debug_coin(coin)
         if coin.price > coin.last:
-            if coin.price > percent(coin.trail_recovery_percentage, coin.dip):
+            if coin.price > coin.dip / 100 * coin.trail_recovery_percentage:
                 self.buy_coin(coin)
                 return True
         return False
@@ -28,10 +28,11 @@ class Strategy(Bot):
         if BTC not in self.coins:
             return False
 
-        unit = str(self.coins[BTC].klines_trend_period[-1:]).lower()
-        klines_trend_period = int(self.coins[BTC].klines_trend_period[:-1])
+        unit = self.coins[BTC].klines_trend_unit
+        klines_trend_period = self.coins[BTC].klines_trend_count
 
-        last_period = list(self.coins[BTC].averages[unit])[
+        # slice the bucket directly, list() would copy the whole thing
+        last_period = self.coins[BTC].averages[unit][
             -klines_trend_period:
         ]
 
@@ -59,7 +60,8 @@ class Strategy(Bot):
 
         # has the price gone down by x% on a coin we don't own?
         if (
-            coin.price < percent(coin.buy_at_percentage, coin.max)
+            # inlined percent() arithmetic, this check runs on every tick
+            coin.price < coin.max / 100 * coin.buy_at_percentage
             and coin.status == ""
             and not coin.naughty
         ):
@@ -78,7 +80,7 @@ class Strategy(Bot):
         # price recorded. This way we ensure that we got the dip
         self.log_debug_coin(coin)
         if coin.price > coin.last:
-            if coin.price > percent(coin.trail_recovery_percentage, coin.dip):
+            if coin.price > coin.dip / 100 * coin.trail_recovery_percentage:
                 self.buy_coin(coin)
                 return True
         return False
\ No newline at end of file
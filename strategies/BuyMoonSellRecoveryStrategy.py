@@ -1,7 +1,6 @@
 """ bot buy strategy file """
 from lib.bot import Bot
 from lib.coin import Coin
-from lib.helpers import percent
 
 
 class Strategy(Bot):
@@ -15,7 +14,8 @@ class Strategy(Bot):
         it buys the coin.
 
         """
-        if coin.price > percent(coin.buy_at_percentage, coin.last):
+        # inlined percent() arithmetic, this check runs on every tick
+        if coin.price > coin.last / 100 * coin.buy_at_percentage:
             self.buy_coin(coin)
             self.log_debug_coin(coin)
             return True
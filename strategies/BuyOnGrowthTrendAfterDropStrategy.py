@@ -16,9 +16,10 @@ class Strategy(Bot):
         As soon that happens buy this coin.
         """
 
-        unit = str(coin.klines_trend_period[-1:]).lower()
-        klines_trend_period = int("".join(coin.klines_trend_period[:-1]))
-        last_period = list(coin.averages[unit])[-klines_trend_period:]
+        unit = coin.klines_trend_unit
+        klines_trend_period = coin.klines_trend_count
+        # slice the bucket directly, list() would copy the whole thing
+        last_period = coin.averages[unit][-klines_trend_period:]
 
         # we need at least a full period of klines before we can
         # make a buy decision
@@ -30,7 +31,8 @@ class Strategy(Bot):
         if (
             coin.status == ""
             and not coin.naughty
-            and coin.price < percent(coin.buy_at_percentage, coin.max)
+            # inlined percent() arithmetic, this check runs on every tick
+            and coin.price < coin.max / 100 * coin.buy_at_percentage
         ):
             coin.dip = coin.price
             coin.status = "TARGET_DIP"
@@ -19,10 +19,11 @@ class Strategy(Bot):
         and buy it as soon we're over the dip by TRAIL_RECOVERY_PERCENTAGE.
         """
 
-        unit = str(coin.klines_trend_period[-1:]).lower()
-        klines_trend_period = int(coin.klines_trend_period[:-1])
+        unit = coin.klines_trend_unit
+        klines_trend_period = coin.klines_trend_count
 
-        last_period = list(coin.averages[unit])[-klines_trend_period:]
+        # slice the bucket directly, list() would copy the whole thing
+        last_period = coin.averages[unit][-klines_trend_period:]
 
         # we need at least a full period of klines before we can
         # make a buy decision
@@ -48,7 +49,8 @@ class Strategy(Bot):
         # check if the maximum price recorded is now lower than the
         # BUY_AT_PERCENTAGE
         if (
-            coin.price < percent(coin.buy_at_percentage, coin.max)
+            # inlined percent() arithmetic, this check runs on every tick
+            coin.price < coin.max / 100 * coin.buy_at_percentage
             and coin.status == ""
             and not coin.naughty
         ):
@@ -68,7 +70,7 @@ class Strategy(Bot):
         # price recorded. This way we ensure that we got the dip
         self.log_debug_coin(coin)
         if coin.price > coin.last:
-            if coin.price > percent(coin.trail_recovery_percentage, coin.dip):
+            if coin.price > coin.dip / 100 * coin.trail_recovery_percentage:
                 self.buy_coin(coin)
                 return True
         return False
@@ -2,7 +2,7 @@
 """ bot buy strategy file """
 from lib.bot import Bot
 from lib.coin import Coin
-from lib.helpers import c_from_timestamp, logging, mean, percent
+from lib.helpers import c_from_timestamp, logging, mean
 
 
 class Strategy(Bot):
@@ -17,10 +17,11 @@ class Strategy(Bot):
         and buy it as soon we're over the dip by TRAIL_RECOVERY_PERCENTAGE.
         """
 
-        unit = str(coin.klines_trend_period[-1:]).lower()
-        klines_trend_period = int("".join(coin.klines_trend_period[:-1]))
+        unit = coin.klines_trend_unit
+        klines_trend_period = coin.klines_trend_count
 
-        last_period = list(coin.averages[unit])[-klines_trend_period:]
+        # slice the bucket directly, list() would copy the whole thing
+        last_period = coin.averages[unit][-klines_trend_period:]
 
         # we need at least a full period of klines before we can
         # make a buy decision
@@ -33,7 +34,8 @@ class Strategy(Bot):
         if (
             coin.status == ""
             and not coin.naughty
-            and (coin.price < percent(coin.buy_at_percentage, average))
+            # inlined percent() arithmetic, this check runs on every tick
+            and (coin.price < average / 100 * coin.buy_at_percentage)
         ):
             coin.dip = coin.price
             logging.info(
@@ -50,7 +52,7 @@ class Strategy(Bot):
         # price recorded. This way we ensure that we got the dip
         self.log_debug_coin(coin)
         if coin.price > coin.last:
-            if coin.price > percent(coin.trail_recovery_percentage, coin.dip):
+            if coin.price > coin.dip / 100 * coin.trail_recovery_percentage:
                 self.buy_coin(coin)
                 return True
         return False
\ No newline at end of file
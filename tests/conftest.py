@@ -0,0 +1,40 @@
+""" shared pytest configuration """
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow",
+        action="store_true",
+        default=False,
+        help="run the slow multi-hour replay tests",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: multi-hour replay test, skipped unless --runslow"
+    )
+    config.addinivalue_line(
+        "markers", "real_sleep: test exercises the real time.sleep"
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch, request):
+    """no-op the bot's sleep calls, so a retry/backoff path reached under
+    mocks can't eat wall-clock time; with the 10s test timeout a stuck
+    retry loop then fails fast instead of sleeping through it"""
+    if "real_sleep" in request.keywords:
+        return
+    monkeypatch.setattr("lib.bot.sleep", lambda *_: None)
+    monkeypatch.setattr("lib.helpers.sleep", lambda *_: None)
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
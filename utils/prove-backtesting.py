@@ -11,63 +11,188 @@ from datetime import datetime, timedelta
 from itertools import islice
 from multiprocessing import Pool
 from string import Template
-from time import sleep
+from time import sleep, strftime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-import pandas as pd
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
 from tenacity import retry, wait_exponential
 
+# pooled session shared by all index fetches; keep-alive skips the
+# tcp/tls handshake the old per-call requests.get paid every time
+_SESSION: requests.Session = requests.Session()
+_adapter: HTTPAdapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+
+# the price-log index barely changes within a run but is re-fetched on
+# every round; remember the last response per url and revalidate it
+# with a conditional GET, so an unchanged index costs a 304 and no body
+_index_cache: Dict[str, Tuple[str, requests.Response]] = {}
+
 
 @retry(wait=wait_exponential(multiplier=2, min=1, max=30))
 def get_index_json(query: str) -> requests.Response:
     """retry wrapper for requests calls"""
-    response: requests.Response = requests.get(query, timeout=5)
+    headers: Dict[str, str] = {}
+    cached: Optional[Tuple[str, requests.Response]] = _index_cache.get(query)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    response: requests.Response = _SESSION.get(
+        query, timeout=5, headers=headers
+    )
+    if response.status_code == 304 and cached:
+        return cached[1]
     status: int = response.status_code
     if status != 200:
         with open("log/price_log_service.response.log", "at") as l:
             l.write(f"{query} {status} {response}\n")
         response.raise_for_status()
+    etag: Optional[str] = response.headers.get("ETag")
+    if etag:
+        _index_cache[query] = (etag, response)
     return response
 
 
 def log_msg(msg: str) -> None:
     """logs out message prefixed with timestamp"""
-    now: str = datetime.now().strftime("%H:%M:%S")
-    print(f"{now} PROVE-BACKTESTING: {msg}")
+    # time.strftime skips the datetime object construction that
+    # datetime.now() pays on every log line
+    print(f"{strftime('%H:%M:%S')} PROVE-BACKTESTING: {msg}")
+
+
+# config templates, built once instead of inside the per-coin and
+# per-run config writers
+_COIN_CONFIG_TMPL: Template = Template(
+    """{
+        "CLEAR_COIN_STATS_AT_BOOT": $CLEAR_COIN_STATS_AT_BOOT,
+        "CLEAR_COIN_STATS_AT_SALE": $CLEAR_COIN_STATS_AT_SALE,
+        "DEBUG": $DEBUG,
+        "ENABLE_NEW_LISTING_CHECKS": $ENABLE_NEW_LISTING_CHECKS,
+        "ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS": $ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS,
+        "INITIAL_INVESTMENT": $INITIAL_INVESTMENT,
+        "KLINES_CACHING_SERVICE_URL": "$KLINES_CACHING_SERVICE_URL",
+        "MAX_COINS": 1,
+        "PAIRING": "$PAIRING",
+        "PAUSE_FOR": $PAUSE_FOR,
+        "PRICE_LOGS": $PRICE_LOGS,
+        "PRICE_LOG_SERVICE_URL": "$PRICE_LOG_SERVICE_URL",
+        "RE_INVEST_PERCENTAGE": $RE_INVEST_PERCENTAGE,
+        "SELL_AS_SOON_IT_DROPS": $SELL_AS_SOON_IT_DROPS,
+        "STOP_BOT_ON_LOSS": $STOP_BOT_ON_LOSS,
+        "STOP_BOT_ON_STALE": $STOP_BOT_ON_STALE,
+        "STRATEGY": "$STRATEGY",
+        "TICKERS": {
+          "$COIN": {
+              "BUY_AT_PERCENTAGE": "$BUY_AT_PERCENTAGE",
+              "SELL_AT_PERCENTAGE": "$SELL_AT_PERCENTAGE",
+              "STOP_LOSS_AT_PERCENTAGE": "$STOP_LOSS_AT_PERCENTAGE",
+              "TRAIL_TARGET_SELL_PERCENTAGE": "$TRAIL_TARGET_SELL_PERCENTAGE",
+              "TRAIL_RECOVERY_PERCENTAGE": "$TRAIL_RECOVERY_PERCENTAGE",
+              "SOFT_LIMIT_HOLDING_TIME": "$SOFT_LIMIT_HOLDING_TIME",
+              "HARD_LIMIT_HOLDING_TIME": "$HARD_LIMIT_HOLDING_TIME",
+              "NAUGHTY_TIMEOUT": "$NAUGHTY_TIMEOUT",
+              "KLINES_TREND_PERIOD": "$KLINES_TREND_PERIOD",
+              "KLINES_SLICE_PERCENTAGE_CHANGE": "$KLINES_SLICE_PERCENTAGE_CHANGE"
+          }
+         },
+        "TRADING_FEE": $TRADING_FEE,
+        }"""
+)
+
+_OPTIMIZED_CONFIG_TMPL: Template = Template(
+    """{
+        "CLEAR_COIN_STATS_AT_BOOT": $CLEAR_COIN_STATS_AT_BOOT,
+        "CLEAR_COIN_STATS_AT_SALE": $CLEAR_COIN_STATS_AT_SALE,
+        "DEBUG": $DEBUG,
+        "ENABLE_NEW_LISTING_CHECKS": $ENABLE_NEW_LISTING_CHECKS,
+        "ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS": $ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS,
+        "INITIAL_INVESTMENT": $INITIAL_INVESTMENT,
+        "KLINES_CACHING_SERVICE_URL": "$KLINES_CACHING_SERVICE_URL",
+        "MAX_COINS": $MAX_COINS,
+        "PAIRING": "$PAIRING",
+        "PAUSE_FOR": $PAUSE_FOR,
+        "PRICE_LOGS": $PRICE_LOGS,
+        "PRICE_LOG_SERVICE_URL": "$PRICE_LOG_SERVICE_URL",
+        "RE_INVEST_PERCENTAGE": $RE_INVEST_PERCENTAGE,
+        "SELL_AS_SOON_IT_DROPS": $SELL_AS_SOON_IT_DROPS,
+        "STOP_BOT_ON_LOSS": $STOP_BOT_ON_LOSS,
+        "STOP_BOT_ON_STALE": $STOP_BOT_ON_STALE,
+        "STRATEGY": "$STRATEGY",
+        "TICKERS": $TICKERS,
+        "TRADING_FEE": $TRADING_FEE
+        }"""
+)
 
 
 def cleanup() -> None:
     """clean files"""
-    for item in glob.glob("configs/coin.*.yaml"):
-        os.remove(item)
-    for item in glob.glob("results/backtesting.coin.*.txt"):
-        os.remove(item)
-    for item in glob.glob("results/backtesting.coin.*.log.gz"):
-        os.remove(item)
+    # one scandir pass per directory instead of a glob (full directory
+    # scan plus fnmatch) per pattern; these dirs accumulate thousands
+    # of per-coin artifacts over long runs
+    for directory, prefix, suffixes in (
+        ("configs", "coin.", (".yaml",)),
+        ("results", "backtesting.coin.", (".txt", ".log.gz")),
+    ):
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(suffixes):
+                    os.remove(entry.path)
     if os.path.exists("log/backtesting.log"):
         os.remove("log/backtesting.log")
 
 
+def daterange_ymd(start_date: datetime, end_date: datetime) -> List[str]:
+    """returns every date between start and end, as YYYYMMDD strings"""
+    # plain date arithmetic; pandas date_range built a whole
+    # DatetimeIndex for a handful of days
+    days: int = (end_date - start_date).days
+    return [
+        (start_date + timedelta(days=n)).strftime("%Y%m%d")
+        for n in range(days + 1)
+    ]
+
+
 def flag_checks() -> None:
     """checks for flags in control/"""
+    # poll every second so a cleared flag resumes the run almost
+    # immediately, but only log once per pause rather than once per poll
+    if not os.path.exists("control/PAUSE"):
+        return
+    log_msg("control/PAUSE flag found. Waiting for it to clear.")
     while os.path.exists("control/PAUSE"):
-        log_msg("control/PAUSE flag found. Sleeping 1min.")
-        sleep(60)
+        sleep(1)
+    log_msg("control/PAUSE flag cleared. Resuming.")
 
 
 def wrap_subprocessing(conf: str, timeout: Optional[int] = 0) -> None:
     """wraps subprocess call"""
     if timeout == 0:
         timeout = None
-    subprocess.run(
-        "python app.py -m backtesting -s tests/fake.yaml "
-        + f"-c configs/{conf} >results/backtesting.{conf}.txt 2>&1",
-        shell=True,
-        timeout=timeout,
-        check=False,
-    )
+    # exec python directly instead of going through a shell; a timeout
+    # then kills the bot process itself rather than the wrapping shell
+    with open(f"results/backtesting.{conf}.txt", "wt") as out:
+        subprocess.run(
+            [
+                "python",
+                "app.py",
+                "-m",
+                "backtesting",
+                "-s",
+                "tests/fake.yaml",
+                "-c",
+                f"configs/{conf}",
+            ],
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            timeout=timeout,
+            check=False,
+        )
 
 
 class ProveBacktesting:
@@ -134,23 +259,15 @@ class ProveBacktesting:
         self, start_date: datetime, end_date: datetime, jump: Optional[int] = 7
     ) -> List[str]:
         """returns a list of dates, with a gap in 'jump' days"""
-        dates = pd.date_range(start_date, end_date, freq="d").strftime(
-            "%Y%m%d"
-        )
+        dates: List[str] = daterange_ymd(start_date, end_date)
         start_dates: List[str] = list(islice(dates, 0, None, jump))
         return start_dates
 
     def rollback_dates_from(self, end_date: str) -> List[str]:
         """returns a list of dates, up to 'days' before the 'end_date'"""
-        dates: List[str] = (
-            pd.date_range(
-                datetime.strptime(str(end_date), "%Y%m%d")
-                - timedelta(days=self.roll_backwards - 1),
-                end_date,
-                freq="d",
-            )
-            .strftime("%Y%m%d")
-            .tolist()
+        _end_date: datetime = datetime.strptime(str(end_date), "%Y%m%d")
+        dates: List[str] = daterange_ymd(
+            _end_date - timedelta(days=self.roll_backwards - 1), _end_date
         )
         return dates
 
@@ -162,25 +279,20 @@ class ProveBacktesting:
         _end_date: datetime = datetime.strptime(
             str(end_date), "%Y%m%d"
         ) + timedelta(days=self.roll_forward)
-        dates: List[str] = (
-            pd.date_range(start_date, _end_date, freq="d")
-            .strftime("%Y%m%d")
-            .tolist()
-        )
+        dates: List[str] = daterange_ymd(start_date, _end_date)
         return dates
 
     def generate_price_log_list(
         self, dates: List[str], symbol: Optional[str] = None
     ) -> List[str]:
         """makes up the price log url list"""
-        urls: List[str] = []
-        for day in dates:
-            if symbol:
-                if self.filter_by in symbol:
-                    urls.append(f"{symbol}/{day}.log.gz")
-            else:
-                urls.append(f"{day}.log.gz")
-        return urls
+        # the symbol filter doesn't change per day, so check it once
+        # instead of on every date in the range
+        if symbol:
+            if self.filter_by not in symbol:
+                return []
+            return [f"{symbol}/{day}.log.gz" for day in dates]
+        return [f"{day}.log.gz" for day in dates]
 
     def write_single_coin_config(
         self, symbol: str, _price_logs: List[str], thisrun: Dict[str, Any]
@@ -190,43 +302,6 @@ class ProveBacktesting:
         if self.filter_by not in symbol:
             return
 
-        tmpl: Template = Template(
-            """{
-        "CLEAR_COIN_STATS_AT_BOOT": $CLEAR_COIN_STATS_AT_BOOT,
-        "CLEAR_COIN_STATS_AT_SALE": $CLEAR_COIN_STATS_AT_SALE,
-        "DEBUG": $DEBUG,
-        "ENABLE_NEW_LISTING_CHECKS": $ENABLE_NEW_LISTING_CHECKS,
-        "ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS": $ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS,
-        "INITIAL_INVESTMENT": $INITIAL_INVESTMENT,
-        "KLINES_CACHING_SERVICE_URL": "$KLINES_CACHING_SERVICE_URL",
-        "MAX_COINS": 1,
-        "PAIRING": "$PAIRING",
-        "PAUSE_FOR": $PAUSE_FOR,
-        "PRICE_LOGS": $PRICE_LOGS,
-        "PRICE_LOG_SERVICE_URL": "$PRICE_LOG_SERVICE_URL",
-        "RE_INVEST_PERCENTAGE": $RE_INVEST_PERCENTAGE,
-        "SELL_AS_SOON_IT_DROPS": $SELL_AS_SOON_IT_DROPS,
-        "STOP_BOT_ON_LOSS": $STOP_BOT_ON_LOSS,
-        "STOP_BOT_ON_STALE": $STOP_BOT_ON_STALE,
-        "STRATEGY": "$STRATEGY",
-        "TICKERS": {
-          "$COIN": {
-              "BUY_AT_PERCENTAGE": "$BUY_AT_PERCENTAGE",
-              "SELL_AT_PERCENTAGE": "$SELL_AT_PERCENTAGE",
-              "STOP_LOSS_AT_PERCENTAGE": "$STOP_LOSS_AT_PERCENTAGE",
-              "TRAIL_TARGET_SELL_PERCENTAGE": "$TRAIL_TARGET_SELL_PERCENTAGE",
-              "TRAIL_RECOVERY_PERCENTAGE": "$TRAIL_RECOVERY_PERCENTAGE",
-              "SOFT_LIMIT_HOLDING_TIME": "$SOFT_LIMIT_HOLDING_TIME",
-              "HARD_LIMIT_HOLDING_TIME": "$HARD_LIMIT_HOLDING_TIME",
-              "NAUGHTY_TIMEOUT": "$NAUGHTY_TIMEOUT",
-              "KLINES_TREND_PERIOD": "$KLINES_TREND_PERIOD",
-              "KLINES_SLICE_PERCENTAGE_CHANGE": "$KLINES_SLICE_PERCENTAGE_CHANGE"
-          }
-         },
-        "TRADING_FEE": $TRADING_FEE,
-        }"""
-        )
-
         # on our coin backtesting runs, we want to quit early if we are using
         # a sort_by mode that discards runs with STALES or LOSSES
         if self.sort_by == "greed":
@@ -238,7 +313,7 @@ class ProveBacktesting:
 
         with open(f"configs/coin.{symbol}.yaml", "wt") as c:
             c.write(
-                tmpl.substitute(
+                _COIN_CONFIG_TMPL.substitute(
                     {
                         "CLEAR_COIN_STATS_AT_BOOT": self.clear_coin_stats_at_boot,
                         "CLEAR_COIN_STATS_AT_SALE": self.clear_coin_stats_at_sale,
@@ -326,33 +401,9 @@ class ProveBacktesting:
         z: Dict[str, Any] = x | _tickers
         _tickers = z
 
-        tmpl: Template = Template(
-            """{
-        "CLEAR_COIN_STATS_AT_BOOT": $CLEAR_COIN_STATS_AT_BOOT,
-        "CLEAR_COIN_STATS_AT_SALE": $CLEAR_COIN_STATS_AT_SALE,
-        "DEBUG": $DEBUG,
-        "ENABLE_NEW_LISTING_CHECKS": $ENABLE_NEW_LISTING_CHECKS,
-        "ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS": $ENABLE_NEW_LISTING_CHECKS_AGE_IN_DAYS,
-        "INITIAL_INVESTMENT": $INITIAL_INVESTMENT,
-        "KLINES_CACHING_SERVICE_URL": "$KLINES_CACHING_SERVICE_URL",
-        "MAX_COINS": $MAX_COINS,
-        "PAIRING": "$PAIRING",
-        "PAUSE_FOR": $PAUSE_FOR,
-        "PRICE_LOGS": $PRICE_LOGS,
-        "PRICE_LOG_SERVICE_URL": "$PRICE_LOG_SERVICE_URL",
-        "RE_INVEST_PERCENTAGE": $RE_INVEST_PERCENTAGE,
-        "SELL_AS_SOON_IT_DROPS": $SELL_AS_SOON_IT_DROPS,
-        "STOP_BOT_ON_LOSS": $STOP_BOT_ON_LOSS,
-        "STOP_BOT_ON_STALE": $STOP_BOT_ON_STALE,
-        "STRATEGY": "$STRATEGY",
-        "TICKERS": $TICKERS,
-        "TRADING_FEE": $TRADING_FEE
-        }"""
-        )
-
         with open(f"configs/optimized.{self.strategy}.yaml", "wt") as c:
             c.write(
-                tmpl.substitute(
+                _OPTIMIZED_CONFIG_TMPL.substitute(
                     {
                         "CLEAR_COIN_STATS_AT_BOOT": self.clear_coin_stats_at_boot,
                         "CLEAR_COIN_STATS_AT_SALE": self.clear_coin_stats_at_sale,
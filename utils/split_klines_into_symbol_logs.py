@@ -4,7 +4,12 @@ import argparse
 import gzip
 import os
 
-from typing import Dict
+from collections import OrderedDict
+from typing import Set, TextIO
+
+# cap on per-symbol file handles kept open; past it the least recently
+# used handle is closed and reopened in append mode when needed again
+MAX_OPEN_FILES = 512
 
 parser = argparse.ArgumentParser()
 parser.add_argument("-f")
@@ -12,42 +17,50 @@ parser.add_argument("-f")
 args = parser.parse_args()
 daylog = args.f
 
+handles: "OrderedDict[str, TextIO]" = OrderedDict()
+already_gzipped: Set[str] = set()
+coin_filenames: Set[str] = set()
+
 with gzip.open(daylog, "rt") as f:
-    lines = f.readlines()
-
-coins: Dict = {}
-coin_filenames = set()
-for line in lines:
-    parts = line.split(" ")
-    symbol = parts[2]
-    price = parts[3]
-
-    date = parts[0].replace("-", "")
-    coin_filename = f"log/{symbol}/{date}.log"
-
-    # if we already have a gzipped file for this coin, it means we've already
-    # processed it, so skip it
-    if os.path.exists(f"{coin_filename}.gz"):
-        continue
-
-    if symbol not in coins:
-        coins[symbol] = {}
-        coins[symbol]["lines"] = []
-        coins[symbol]["oldprice"] = 0
-
-    coins[symbol]["lines"].append(line)
-    coins[symbol]["price"] = price
-
-    if not os.path.exists(f"log/{symbol}"):
-        os.mkdir(f"log/{symbol}")
-        # create empty file
-        with open(coin_filename, "w", encoding="utf-8") as c:
-            pass
-
-    if coins[symbol]["oldprice"] != coins[symbol]["price"]:
-        coin_filenames.add(coin_filename)
-        with open(coin_filename, "a", encoding="utf-8") as c:
-            c.write(line)
+    # stream the decompressed log line by line; readlines() pulled a
+    # whole day of klines into memory before we'd written anything out
+    for line in f:
+        parts = line.split(" ")
+        symbol = parts[2]
+
+        date = parts[0].replace("-", "")
+        coin_filename = f"log/{symbol}/{date}.log"
+
+        # if we already have a gzipped file for this coin, it means we've
+        # already processed it, so skip it
+        if coin_filename in already_gzipped:
+            continue
+
+        if coin_filename not in coin_filenames:
+            if os.path.exists(f"{coin_filename}.gz"):
+                already_gzipped.add(coin_filename)
+                continue
+            if not os.path.exists(f"log/{symbol}"):
+                os.mkdir(f"log/{symbol}")
+            coin_filenames.add(coin_filename)
+
+        # reuse an open handle for this coin instead of paying an
+        # open/append/close cycle on every single line
+        c = handles.get(coin_filename)
+        if c is None:
+            if len(handles) >= MAX_OPEN_FILES:
+                _, lru = handles.popitem(last=False)
+                lru.close()
+            c = open(  # pylint: disable=R1732
+                coin_filename, "a", encoding="utf-8"
+            )
+            handles[coin_filename] = c
+        else:
+            handles.move_to_end(coin_filename)
+        c.write(line)
+
+for c in handles.values():
+    c.close()
 
 for coin_filename in coin_filenames:
     with gzip.open(f"{coin_filename}.gz", "wt") as z: